@@ -4,11 +4,12 @@ from src.layout import create_layout
 from src import callbacks # Import callbacks to register them
 
 # Initialize the app with the CYBORG theme
+# Every tab is rendered up front, so all callback IDs exist in the initial layout
+# and Dash can validate them once at startup
 app = dash.Dash(
     __name__, 
     external_stylesheets=[dbc.themes.CYBORG, "assets/custom_styles.css"],
-    title="Media Analytics Dashboard",
-    suppress_callback_exceptions=True
+    title="Media Analytics Dashboard"
 )
 
 server = app.server
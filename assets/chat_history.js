@@ -0,0 +1,100 @@
+/* assets/chat_history.js */
+
+/* Renders the AI chat history in the browser: messages already built are kept
+   and only the newly appended ones are turned into components. */
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+  chat: (function () {
+    var rendered = [];   // Components built so far, one per message
+    var signatures = []; // role|timestamp of each rendered message
+
+    function component(namespace, type, props) {
+      return { namespace: namespace, type: type, props: props };
+    }
+
+    function timeString(timestamp) {
+      var match = /T(\d{2}:\d{2}:\d{2})/.exec(timestamp || '');
+      return match ? match[1] : '';
+    }
+
+    function renderMessage(msg) {
+      var role = msg.role || 'user';
+      var content = msg.content || '';
+      var time = component('dash_html_components', 'Small', {
+        children: timeString(msg.timestamp),
+        className: 'text-muted d-block mb-1'
+      });
+      var bubble, align;
+
+      if (role === 'user') {
+        // User message (right-aligned, blue)
+        align = 'right';
+        bubble = component('dash_html_components', 'Div', {
+          children: content,
+          className: 'p-2 rounded',
+          style: { backgroundColor: '#0d6efd', color: '#fff', display: 'inline-block', maxWidth: '80%' }
+        });
+      } else if (role === 'assistant') {
+        // AI message (left-aligned, green)
+        align = 'left';
+        bubble = component('dash_bootstrap_components', 'Alert', {
+          children: content,
+          color: 'success',
+          className: 'mb-0',
+          style: { whiteSpace: 'pre-wrap', maxWidth: '90%', display: 'inline-block' }
+        });
+      } else {
+        // Error message (left-aligned, red)
+        align = 'left';
+        bubble = component('dash_bootstrap_components', 'Alert', {
+          children: content,
+          color: 'danger',
+          className: 'mb-0',
+          style: { maxWidth: '90%', display: 'inline-block' }
+        });
+      }
+
+      return component('dash_html_components', 'Div', {
+        children: [component('dash_html_components', 'Div', {
+          children: [time, bubble],
+          style: { textAlign: align }
+        })],
+        className: 'mb-3'
+      });
+    }
+
+    function signature(msg) {
+      return (msg.role || 'user') + '|' + (msg.timestamp || '');
+    }
+
+    return {
+      render_history: function (history) {
+        if (!history || !history.length) {
+          rendered = [];
+          signatures = [];
+          return component('dash_html_components', 'P', {
+            children: 'Aucun message. Posez une question pour commencer !',
+            className: 'text-muted text-center',
+            style: { marginTop: '100px' }
+          });
+        }
+
+        // Keep the rendered prefix only if the history still starts with it (not cleared or replaced)
+        var keep = Math.min(rendered.length, history.length);
+        for (var i = 0; i < keep; i++) {
+          if (signatures[i] !== signature(history[i])) {
+            keep = i;
+            break;
+          }
+        }
+        rendered = rendered.slice(0, keep);
+        signatures = signatures.slice(0, keep);
+
+        for (var j = keep; j < history.length; j++) {
+          rendered.push(renderMessage(history[j]));
+          signatures.push(signature(history[j]));
+        }
+        return rendered.slice();
+      }
+    };
+  })()
+});
@@ -1,12 +1,59 @@
 import json
+import mmap
+import re
 import pandas as pd
 import os
 import glob
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+from datetime import datetime
+
+# orjson (parseur C/SIMD) est 2 à 4x plus rapide que json ; on garde json en secours
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# ijson permet de ne lire que la liste d'articles sans charger tout le document
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# pysimdjson accélère les fichiers NDJSON (un document par ligne) avec un parseur réutilisé
+try:
+    import simdjson
+except ImportError:
+    simdjson = None
 
 # --- CONFIGURATION ---
 RAW_DATA_PATH = os.path.join("data", "raw")
 PROCESSED_DATA_PATH = os.path.join("data", "processed")
-OUTPUT_FILE = os.path.join(PROCESSED_DATA_PATH, "clean_data.csv")
+OUTPUT_FILE = os.path.join(PROCESSED_DATA_PATH, "clean_data.parquet")
+
+# Colonnes candidates pour la date, puis colonnes vitales conservées
+DATE_COLUMNS = ['date_published', 'date', 'created_at', 'published_at']
+USEFUL_COLUMNS = ['title', 'kws', 'loc', 'org', 'per', 'url', 'content']
+
+# Colonnes texte stockées en chaînes Arrow ; celles qui se répètent beaucoup passent en 'category'
+TEXT_COLUMNS = ['title', 'url', 'content']
+CATEGORY_MAX_RATIO = 0.5 # Valeurs distinctes / lignes en dessous duquel on catégorise
+
+# Formats de date essayés sur un échantillon (un format explicite évite l'analyse ligne à ligne)
+DATE_FORMATS = ['%Y-%m-%dT%H:%M:%S', '%Y-%m-%dT%H:%M:%SZ', '%Y-%m-%dT%H:%M:%S%z', '%Y-%m-%d %H:%M:%S', '%Y-%m-%d']
+
+# Premier caractère non blanc (is_ndjson vérifie qu'il reste du contenu après la première ligne)
+NON_SPACE = re.compile(rb'\S')
+
+# Emplacements connus de la liste d'articles (préfixe ijson du tableau -> préfixe de ses éléments),
+# dans l'ordre de priorité de get_articles_from_file
+ARTICLE_PATHS = {
+    '': 'item',                  # Liste directe
+    'data.all': 'data.all.item', # Format Sputnik complexe
+    'data': 'data.item',         # Format standard
+    'data-all': 'data-all.item',
+    'items': 'items.item',
+}
 
 def get_articles_from_file(content):
     """
@@ -35,60 +82,204 @@ def get_articles_from_file(content):
             
     return [] # Si on ne trouve rien
 
+def parse_json(data):
+    """
+    Décode un document JSON (octets) avec orjson, ou json à défaut.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def read_json(path):
+    """
+    Lit un fichier JSON d'un bloc (en octets).
+    """
+    with open(path, 'rb') as f:
+        return parse_json(f.read())
+
+def is_ndjson(path):
+    """
+    Détecte un fichier NDJSON : la première ligne est un objet JSON complet
+    et d'autres lignes suivent.
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return False
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            end_first_line = mm.find(b'\n')
+            if end_first_line == -1 or NON_SPACE.search(mm, end_first_line) is None:
+                return False
+            first_line = mm[:end_first_line].strip()
+            if not first_line.startswith(b'{'):
+                return False
+            try:
+                parse_json(first_line)
+            except ValueError:
+                return False
+            return True
+
+def iter_ndjson_articles(path):
+    """
+    Parcourt un fichier NDJSON projeté en mémoire (mmap), ligne par ligne.
+    Chaque ligne est soit un lot d'articles (formats connus), soit un article.
+    """
+    parser = simdjson.Parser() if simdjson is not None else None
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for line in iter(mm.readline, b''):
+            line = line.strip()
+            if not line:
+                continue
+            doc = parser.parse(line, recursive=True) if parser is not None else parse_json(line)
+            articles = get_articles_from_file(doc)
+            if articles:
+                yield from articles
+            elif isinstance(doc, dict):
+                yield doc
+
+def iter_articles(path):
+    """
+    Parcourt les articles d'un fichier un par un, sans matérialiser le document complet.
+    On sonde d'abord le flux pour trouver où se cache la liste (dans le même ordre de
+    priorité que get_articles_from_file), puis on ne construit que ses éléments.
+    Sans ijson, ou si la sonde ne trouve rien, on se rabat sur une lecture complète.
+    Les fichiers NDJSON sont lus ligne par ligne.
+    """
+    if is_ndjson(path):
+        yield from iter_ndjson_articles(path)
+        return
+
+    if ijson is None:
+        yield from get_articles_from_file(read_json(path))
+        return
+
+    with open(path, 'rb') as f:
+        found, data_has_all = set(), False
+        for prefix, event, value in ijson.parse(f):
+            if event == 'start_array' and prefix in ARTICLE_PATHS:
+                found.add(prefix)
+                # Rien ne passe avant la liste directe ou 'data' (data.all et data s'excluent) :
+                # sinon une clé prioritaire peut encore venir plus loin dans le flux
+                if prefix in ('', 'data.all', 'data'):
+                    break
+            elif event == 'map_key' and prefix == 'data' and value == 'all':
+                data_has_all = True # data.all existe, mais n'est peut-être pas une liste
+        item_prefix = next((ARTICLE_PATHS[p] for p in ARTICLE_PATHS if p in found), None)
+        if item_prefix is None or (data_has_all and 'data.all' not in found):
+            # Format inattendu : une seule lecture complète tranche comme get_articles_from_file
+            f.seek(0)
+            yield from get_articles_from_file(parse_json(f.read()))
+            return
+
+        f.seek(0)
+        yield from ijson.items(f, item_prefix, use_float=True)
+
+def detect_date_format(dates):
+    """
+    Devine le format des dates à partir du premier échantillon non vide.
+    Renvoie 'ISO8601' si aucun format connu ne correspond.
+    """
+    samples = dates.dropna()
+    if samples.empty:
+        return 'ISO8601'
+    sample = samples.iloc[0]
+    for fmt in DATE_FORMATS:
+        try:
+            datetime.strptime(sample, fmt)
+            return fmt
+        except (TypeError, ValueError):
+            continue
+    return 'ISO8601'
+
+def optimize_dtypes(df):
+    """
+    Réduit l'empreinte mémoire du tableau avant la sauvegarde :
+    textes en chaînes Arrow (ou 'category' s'ils se répètent), numériques rétrécis.
+    """
+    for c in TEXT_COLUMNS:
+        if c not in df.columns:
+            continue
+        if c != 'content' and df[c].nunique() <= CATEGORY_MAX_RATIO * len(df):
+            df[c] = df[c].astype('category')
+        else:
+            df[c] = df[c].astype('string[pyarrow]')
+
+    for c in df.select_dtypes(include='integer').columns:
+        df[c] = pd.to_numeric(df[c], downcast='integer')
+    for c in df.select_dtypes(include='float').columns:
+        df[c] = pd.to_numeric(df[c], downcast='float')
+    return df
+
+def parse_file(path):
+    """
+    Lit un fichier brut et renvoie (articles, erreur).
+    Exécutée dans un processus séparé : chaque fichier est indépendant des autres.
+    Les éléments qui ne sont pas des objets JSON (chaînes, nombres...) sont ignorés.
+    """
+    try:
+        return [article for article in iter_articles(path) if isinstance(article, dict)], None
+    except Exception as e:
+        return [], str(e)
+
+def report_results(json_files, results):
+    """
+    Affiche le bilan de chaque fichier et produit ses articles, dans l'ordre des fichiers.
+    """
+    for file, (articles, error) in zip(json_files, results):
+        print(f"Lecture de {os.path.basename(file)}...", end=" ")
+        if error is not None:
+            print(f"Erreur : {error}")
+        elif articles:
+            print(f"-> {len(articles)} articles récupérés.")
+            yield articles
+        else:
+            print("-> 0 article trouvé (Format vide ou inconnu).")
+
 def load_and_clean():
-    all_data = []
+    # Le tableau est construit colonne par colonne : une liste par champ utile
+    columns = {c: [] for c in DATE_COLUMNS + USEFUL_COLUMNS}
     json_files = glob.glob(os.path.join(RAW_DATA_PATH, "*.json"))
     
     print(f"Fichiers trouvés : {len(json_files)}")
 
-    for file in json_files:
-        print(f"Lecture de {os.path.basename(file)}...", end=" ")
-        try:
-            with open(file, 'r', encoding='utf-8') as f:
-                content = json.load(f)
-            
-            # C'est ICI la différence : on utilise la fonction intelligente
-            articles = get_articles_from_file(content)
-            
-            if len(articles) > 0:
-                all_data.extend(articles)
-                print(f"-> {len(articles)} articles récupérés.")
-            else:
-                print("-> 0 article trouvé (Format vide ou inconnu).")
-                
-        except Exception as e:
-            print(f"Erreur : {e}")
+    # Lecture en parallèle (un processus par cœur), résultats récupérés dans l'ordre des fichiers
+    with ProcessPoolExecutor() as executor:
+        results = executor.map(parse_file, json_files, chunksize=4)
+        for article in chain.from_iterable(report_results(json_files, results)):
+            for c, values in columns.items():
+                values.append(article.get(c))
 
     # Vérification
-    if len(all_data) == 0:
+    nb_articles = len(columns[DATE_COLUMNS[0]])
+    if not nb_articles:
         print("STOP : Aucun article trouvé au total. Vérifie le problème 'inspect.py'.")
         return
 
     # 2. Convertir en DataFrame
-    print(f"\nCréation du tableau avec {len(all_data)} articles...")
-    df = pd.DataFrame(all_data)
+    print(f"\nCréation du tableau avec {nb_articles} articles...")
+    # On écarte les champs absents de tous les articles
+    df = pd.DataFrame({c: values for c, values in columns.items() if any(v is not None for v in values)})
 
     # 3. Nettoyage Date
     # On cherche la bonne colonne
     col_date = None
-    for c in ['date_published', 'date', 'created_at', 'published_at']:
+    for c in DATE_COLUMNS:
         if c in df.columns:
             col_date = c
             break
             
     if col_date:
-        print(f"Formatage des dates (colonne: {col_date})...")
-        df[col_date] = pd.to_datetime(df[col_date], errors='coerce')
-        df = df.dropna(subset=[col_date])
-        df = df.rename(columns={col_date: 'date'}) # On standardise le nom
-        
-        # On garde les colonnes vitales
-        cols_utiles = ['date', 'title', 'kws', 'loc', 'org', 'per', 'url', 'content']
-        cols_finales = [c for c in cols_utiles if c in df.columns]
-        df = df[cols_finales]
+        date_format = detect_date_format(df[col_date])
+        print(f"Formatage des dates (colonne: {col_date}, format: {date_format})...")
+
+        # On garde les colonnes vitales d'abord, pour ne jamais recopier les autres
+        df = df[[col_date] + [c for c in USEFUL_COLUMNS if c in df.columns]]
+        # Conversion et renommage en une seule affectation (on standardise le nom)
+        df.insert(0, 'date', pd.to_datetime(df.pop(col_date), format=date_format, errors='coerce'))
+        df = df.dropna(subset=['date']).reset_index(drop=True)
+        df = optimize_dtypes(df)
         
-        # Sauvegarde
-        df.to_csv(OUTPUT_FILE, index=False)
+        # Sauvegarde en Parquet : les listes (kws, loc...) restent de vraies listes
+        df.to_parquet(OUTPUT_FILE, index=False, compression='zstd', engine='pyarrow')
         print(f"Succès ! Fichier sauvegardé : {OUTPUT_FILE}")
     else:
         print("Erreur : Impossible de trouver une date dans les colonnes:", df.columns)
@@ -3,6 +3,7 @@ AI Prompt Engineering Module
 Contains system prompts, context templates, and helper functions for Groq AI integration.
 """
 
+import re
 import pandas as pd
 
 # --- System Prompts ---
@@ -105,28 +106,29 @@ CONTEXT_TEMPLATE = """
 
 # --- Query Type Detection ---
 
+# Keywords per query type, in priority order (first matching type wins)
+QUERY_TYPE_KEYWORDS = [
+    ('trend', ['tendance', 'évolution', 'croissance', 'changement', 'progression', 'temporel', 'temps']),
+    ('sentiment', ['sentiment', 'opinion', 'perception', 'ressenti', 'positif', 'négatif', 'ton']),
+    ('summary', ['résumé', 'synthèse', 'aperçu', 'global', 'général', 'vue d\'ensemble']),
+    ('entity', ['qui', 'où', 'quelle organisation', 'personnalité', 'personne', 'lieu', 'pays', 'ville']),
+]
+
+# One compiled alternation per type: a single regex scan replaces a substring search per keyword
+QUERY_TYPE_PATTERNS = [
+    (query_type, re.compile('|'.join(re.escape(kw) for kw in keywords), re.IGNORECASE))
+    for query_type, keywords in QUERY_TYPE_KEYWORDS
+]
+
+
 def detect_query_type(query: str) -> str:
     """
     Detects the type of query based on keywords.
     Returns one of: 'trend', 'sentiment', 'summary', 'entity', 'general'
     """
-    query_lower = query.lower()
-
-    # Trend analysis keywords
-    if any(kw in query_lower for kw in ['tendance', 'évolution', 'croissance', 'changement', 'progression', 'temporel', 'temps']):
-        return 'trend'
-
-    # Sentiment analysis keywords
-    if any(kw in query_lower for kw in ['sentiment', 'opinion', 'perception', 'ressenti', 'positif', 'négatif', 'ton']):
-        return 'sentiment'
-
-    # Summary keywords
-    if any(kw in query_lower for kw in ['résumé', 'synthèse', 'aperçu', 'global', 'général', 'vue d\'ensemble']):
-        return 'summary'
-
-    # Entity analysis keywords
-    if any(kw in query_lower for kw in ['qui', 'où', 'quelle organisation', 'personnalité', 'personne', 'lieu', 'pays', 'ville']):
-        return 'entity'
+    for query_type, pattern in QUERY_TYPE_PATTERNS:
+        if pattern.search(query):
+            return query_type
 
     return 'general'
 
@@ -167,41 +169,18 @@ def format_entity_list(series: pd.Series, entity_type: str, top_n: int = 10) ->
     return '\n'.join(lines)
 
 
-def format_article_sample(row: pd.Series, include_content: bool = False) -> str:
-    """
-    Formats a single article row as a structured block.
+# Entity columns shown per article: (column, max values listed, placeholder when empty)
+ARTICLE_ENTITY_LIMITS = [('kws', 5, 'Aucun'), ('loc', 3, 'Aucun'), ('org', 3, 'Aucune'), ('per', 3, 'Aucune')]
 
-    Args:
-        row: Pandas Series representing one article
-        include_content: Whether to include full article content (can be long)
-
-    Returns:
-        Formatted article string
-    """
-    date_str = row['date'].strftime('%Y-%m-%d') if hasattr(row['date'], 'strftime') else str(row['date'])
-
-    # Format entities
-    kws = ', '.join(row['kws'][:5]) if row['kws'] else 'Aucun'
-    locs = ', '.join(row['loc'][:3]) if row['loc'] else 'Aucun'
-    orgs = ', '.join(row['org'][:3]) if row['org'] else 'Aucune'
-    pers = ', '.join(row['per'][:3]) if row['per'] else 'Aucune'
-
-    article_text = f"""
-### {row['title']}
-- **Date** : {date_str}
+ARTICLE_TEMPLATE = """
+### {title}
+- **Date** : {date}
 - **Mots-clés** : {kws}
-- **Lieux** : {locs}
-- **Organisations** : {orgs}
-- **Personnalités** : {pers}
+- **Lieux** : {loc}
+- **Organisations** : {org}
+- **Personnalités** : {per}
 """
 
-    if include_content and row['content']:
-        # Truncate content to avoid token overflow
-        content_preview = row['content'][:300] + '...' if len(row['content']) > 300 else row['content']
-        article_text += f"- **Aperçu** : {content_preview}\n"
-
-    return article_text
-
 
 def format_article_samples(df: pd.DataFrame, max_articles: int = 15) -> str:
     """
@@ -217,10 +196,23 @@ def format_article_samples(df: pd.DataFrame, max_articles: int = 15) -> str:
     if df.empty:
         return "- Aucun article dans la sélection filtrée"
 
-    # Take most recent articles
+    # Take most recent articles and format each field once per column, not once per row
     sample_df = df.head(max_articles)
+    if pd.api.types.is_datetime64_any_dtype(sample_df['date']):
+        dates = sample_df['date'].dt.strftime('%Y-%m-%d').tolist()
+    else:
+        dates = sample_df['date'].astype(str).tolist()
+    entities = {
+        col: [', '.join(values[:limit]) if values else empty for values in sample_df[col]]
+        for col, limit, empty in ARTICLE_ENTITY_LIMITS
+    }
 
-    articles = [format_article_sample(row, include_content=False) for _, row in sample_df.iterrows()]
+    articles = [
+        ARTICLE_TEMPLATE.format(title=title, date=date_str, kws=kws, loc=loc, org=org, per=per)
+        for title, date_str, kws, loc, org, per in zip(
+            sample_df['title'], dates, entities['kws'], entities['loc'], entities['org'], entities['per']
+        )
+    ]
     return '\n'.join(articles)
 
 
@@ -4,11 +4,20 @@ Handles Groq API integration, context preparation, and response generation.
 """
 
 import os
+import json
+import time
+import atexit
+import hashlib
+import threading
+import importlib.util
+import httpx
 import pandas as pd
 import tiktoken
-from groq import Groq
+from collections import OrderedDict
+from functools import lru_cache
+from groq import Groq, DefaultHttpxClient
 from dotenv import load_dotenv
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 
 from .ai_prompts import (
     build_system_prompt,
@@ -18,7 +27,152 @@ from .ai_prompts import (
     format_article_samples,
     format_filter_info
 )
-from .data_processing import explode_entities
+from .data_processing import count_entities
+
+# xxh3 hashes cache keys several times faster than BLAKE2; hashlib stays as fallback
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+# cl100k_base averages well above 3 characters per token on French prose,
+# so a context shorter than max_tokens * 3 characters is taken as fitting
+MIN_CHARS_PER_TOKEN = 3
+
+# Inserted where the middle of an oversized context was cut; the margin
+# (in tokens) covers the marker itself
+TRUNCATION_MARKER = "\n[... Contenu tronqué pour respecter les limites de tokens ...]\n"
+TRUNCATION_MARGIN = 32
+
+# Number of prepared contexts kept in memory (follow-up questions reuse them)
+CONTEXT_CACHE_SIZE = 64
+
+# Keep a few warm connections to the Groq API so questions asked a while apart
+# skip the TCP/TLS handshake (httpx closes idle connections after 5s by default)
+HTTP_LIMITS = httpx.Limits(max_connections=10, max_keepalive_connections=4, keepalive_expiry=300)
+
+# On-disk cache of Groq answers, shared across restarts and worker processes
+RESPONSE_CACHE_DIR = '.ai_cache'
+RESPONSE_CACHE_TTL = 86400  # seconds
+
+# Titles hashed at each end of a filtered dataframe when fingerprinting it
+FINGERPRINT_SAMPLE_ROWS = 64
+
+
+@lru_cache(maxsize=None)
+def get_encoding(name: str = "cl100k_base") -> tiktoken.Encoding:
+    """
+    Returns a shared tiktoken encoding (loading the BPE ranks is costly).
+
+    Args:
+        name: tiktoken encoding name (cl100k_base is the GPT-4 encoding, close enough)
+
+    Returns:
+        The tiktoken Encoding instance
+    """
+    return tiktoken.get_encoding(name)
+
+
+@lru_cache(maxsize=128)
+def _count_tokens(text: str, encoding_name: str = "cl100k_base") -> int:
+    """
+    Memoized token count; the same context is often measured several times.
+    encode_ordinary skips the special-token scan, which plain text never needs.
+    """
+    return len(get_encoding(encoding_name).encode_ordinary(text))
+
+
+def hash_bytes(data: bytes) -> str:
+    """
+    Non-cryptographic 128-bit digest used for cache keys.
+
+    Returns:
+        32-character hex digest (xxh3_128, or BLAKE2b without xxhash)
+    """
+    if xxhash is not None:
+        return xxhash.xxh3_128_hexdigest(data)
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def dataframe_fingerprint(df: pd.DataFrame) -> Tuple[int, int, int, str]:
+    """
+    Computes a cheap content fingerprint of a filtered dataframe.
+    The row labels identify which articles of the corpus were kept and are
+    hashed as raw int64 bytes; only the titles at both ends are hashed, as a
+    guard against a reloaded corpus.
+
+    Args:
+        df: Filtered DataFrame
+
+    Returns:
+        Tuple (row count, min date, max date, rows hash)
+    """
+    n = FINGERPRINT_SAMPLE_ROWS
+    titles = pd.concat([df['title'].head(n), df['title'].tail(n)]).astype(str)
+    payload = df.index.to_numpy(dtype='int64').tobytes() + '\x00'.join(titles).encode('utf-8')
+    return (
+        len(df),
+        int(df['date'].min().value),
+        int(df['date'].max().value),
+        hash_bytes(payload)
+    )
+
+
+def response_cache_key(model: str, system_prompt: str, context: str, user_query: str) -> str:
+    """
+    Builds the on-disk cache key of a Groq request.
+
+    Returns:
+        Hex digest identifying (model, system prompt, context, question)
+    """
+    payload = '\x00'.join([model, system_prompt, context, user_query]).encode('utf-8')
+    return hash_bytes(payload)
+
+
+def load_cached_response(key: str) -> Optional[Dict[str, Any]]:
+    """
+    Returns the cached response for key, or None if missing or expired.
+    An expired entry is deleted.
+    """
+    path = os.path.join(RESPONSE_CACHE_DIR, f"{key}.json")
+    try:
+        if time.time() - os.path.getmtime(path) > RESPONSE_CACHE_TTL:
+            os.remove(path)  # Already gone (another worker) is fine: OSError is ignored below
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def remove_expired_responses() -> None:
+    """
+    Deletes the cached responses older than RESPONSE_CACHE_TTL.
+    """
+    now = time.time()
+    for entry in os.scandir(RESPONSE_CACHE_DIR):
+        try:
+            if entry.name.endswith('.json') and now - entry.stat().st_mtime > RESPONSE_CACHE_TTL:
+                os.remove(entry.path)
+        except OSError:
+            pass  # Removed by another worker in the meantime
+
+
+def save_cached_response(key: str, result: Dict[str, Any]) -> None:
+    """
+    Stores a response on disk. Failures are ignored: the cache is best effort.
+    Expired entries are swept at the same time, so unrequested ones do not pile up.
+    """
+    path = os.path.join(RESPONSE_CACHE_DIR, f"{key}.json")
+    try:
+        os.makedirs(RESPONSE_CACHE_DIR, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False)
+        os.replace(tmp_path, path)  # Atomic, so concurrent workers never read a partial file
+        remove_expired_responses()
+    except OSError:
+        pass
 
 
 class GroqAIService:
@@ -44,9 +198,18 @@ class GroqAIService:
                 "Veuillez ajouter votre clé API dans le fichier .env"
             )
 
-        self.client = Groq(api_key=api_key)
+        # Single long-lived HTTP connection pool (HTTP/2 when the h2 package is installed)
+        http_client = DefaultHttpxClient(
+            http2=importlib.util.find_spec('h2') is not None,
+            limits=HTTP_LIMITS
+        )
+        self.client = Groq(api_key=api_key, http_client=http_client)
+        atexit.register(self.client.close)
         self.model = model
-        self.encoding = tiktoken.get_encoding("cl100k_base")  # GPT-4 encoding, close enough
+        self.encoding = get_encoding("cl100k_base")  # GPT-4 encoding, close enough
+        self._context_cache = OrderedDict()  # (fingerprint, filters, max_articles) -> context
+        # Callbacks run concurrently: guards the LRU dict (contexts are built outside it)
+        self._context_cache_lock = threading.Lock()
 
     def count_tokens(self, text: str) -> int:
         """
@@ -58,7 +221,7 @@ class GroqAIService:
         Returns:
             Number of tokens
         """
-        return len(self.encoding.encode(text))
+        return _count_tokens(text, self.encoding.name)
 
     def prepare_data_context(
         self,
@@ -68,6 +231,7 @@ class GroqAIService:
     ) -> str:
         """
         Prepares a structured context from the filtered dataframe.
+        Contexts are memoized on a fingerprint of the dataframe and the selected filters.
 
         Args:
             df: Filtered DataFrame
@@ -80,6 +244,17 @@ class GroqAIService:
         if df.empty:
             return "Aucun article ne correspond aux filtres actuels."
 
+        # Follow-up questions on the same selection reuse the prepared context
+        filters_key = (
+            tuple(sorted(filters.get('keywords') or [])),
+            tuple(sorted(filters.get('locations') or []))
+        )
+        cache_key = (dataframe_fingerprint(df), filters_key, max_articles)
+        with self._context_cache_lock:
+            if cache_key in self._context_cache:
+                self._context_cache.move_to_end(cache_key)
+                return self._context_cache[cache_key]
+
         # Extract metadata
         total_articles = len(df)
         start_date = df['date'].min().strftime('%Y-%m-%d')
@@ -90,11 +265,12 @@ class GroqAIService:
         selected_locs = filters.get('locations', [])
         kws_str, locs_str = format_filter_info(selected_kws, selected_locs)
 
-        # Get top entities using explode_entities
-        top_keywords = explode_entities(df, 'kws').value_counts()
-        top_locations = explode_entities(df, 'loc').value_counts()
-        top_persons = explode_entities(df, 'per').value_counts()
-        top_organizations = explode_entities(df, 'org').value_counts()
+        # Get top entities for the four entity columns in a single helper call
+        entity_counts = count_entities(df, ['kws', 'loc', 'per', 'org'])
+        top_keywords = entity_counts['kws']
+        top_locations = entity_counts['loc']
+        top_persons = entity_counts['per']
+        top_organizations = entity_counts['org']
 
         # Format entity lists
         kws_formatted = format_entity_list(top_keywords, 'mots-clés', top_n=10)
@@ -120,12 +296,19 @@ class GroqAIService:
             sample_articles=articles_formatted
         )
 
+        with self._context_cache_lock:
+            self._context_cache[cache_key] = context
+            if len(self._context_cache) > CONTEXT_CACHE_SIZE:
+                self._context_cache.popitem(last=False)
+
         return context
 
     def truncate_context(self, context: str, max_tokens: int = 6000) -> str:
         """
         Truncates context if it exceeds max tokens.
-        Uses a simple truncation strategy: keep beginning and end, remove middle.
+        Keeps the beginning (metadata, top entities) and the end, removes the middle.
+        The cut is made on token ids: the text is encoded once and decoded once,
+        with no second encoding pass to check the result.
 
         Args:
             context: The context string
@@ -134,30 +317,24 @@ class GroqAIService:
         Returns:
             Truncated context if necessary
         """
-        token_count = self.count_tokens(context)
-
-        if token_count <= max_tokens:
+        # Cheap length check first: only pay for BPE when close to the limit
+        if len(context) < max_tokens * MIN_CHARS_PER_TOKEN:
             return context
 
-        # Simple truncation: keep essential parts
-        lines = context.split('\n')
+        # encode_ordinary skips the special-token scan, which plain text never needs
+        ids = self.encoding.encode_ordinary(context)
 
-        # Keep first 60% and last 20% of lines (metadata + some samples)
-        keep_start = int(len(lines) * 0.6)
-        keep_end = int(len(lines) * 0.2)
-
-        truncated_lines = lines[:keep_start] + [
-            "\n[... Contenu tronqué pour respecter les limites de tokens ...]\n"
-        ] + lines[-keep_end:]
+        if len(ids) <= max_tokens:
+            return context
 
-        truncated_context = '\n'.join(truncated_lines)
+        # Keep 80% of the budget for the head, the rest (minus room for the marker) for the tail
+        marker_ids = self.encoding.encode_ordinary(TRUNCATION_MARKER)
+        keep_head = int(max_tokens * 0.8)
+        keep_tail = max(max_tokens - keep_head - TRUNCATION_MARGIN, 0)
 
-        # Verify truncation worked
-        if self.count_tokens(truncated_context) > max_tokens:
-            # More aggressive truncation
-            truncated_context = context[:int(len(context) * 0.5)] + "\n[... Tronqué ...]"
+        truncated_ids = ids[:keep_head] + marker_ids + (ids[-keep_tail:] if keep_tail else [])
 
-        return truncated_context
+        return self.encoding.decode(truncated_ids)
 
     def generate_response(
         self,
@@ -167,6 +344,7 @@ class GroqAIService:
     ) -> Dict[str, Any]:
         """
         Generates an AI response using Groq API.
+        Successful responses are cached on disk for RESPONSE_CACHE_TTL seconds.
 
         Args:
             user_query: The user's question
@@ -187,6 +365,12 @@ class GroqAIService:
             # Truncate context if needed
             truncated_context = self.truncate_context(data_context, max_tokens=6000)
 
+            # Same question on the same context: skip the API round-trip
+            cache_key = response_cache_key(self.model, system_prompt, truncated_context, user_query)
+            cached = load_cached_response(cache_key)
+            if cached is not None:
+                return cached
+
             # Prepare messages
             messages = [
                 {
@@ -212,11 +396,13 @@ class GroqAIService:
             # Extract response content
             ai_message = response.choices[0].message.content
 
-            return {
+            result = {
                 'success': True,
                 'message': ai_message,
                 'query_type': query_type
             }
+            save_cached_response(cache_key, result)
+            return result
 
         except Exception as e:
             error_msg = str(e)
@@ -1,6 +1,16 @@
-from dash import Input, Output, State, callback, no_update, ctx, html
+from dash import Input, Output, State, ClientsideFunction, callback, clientside_callback, no_update
+from dash.exceptions import PreventUpdate
 import pandas as pd
-from src.data_processing import load_data, filter_data, explode_entities
+from src.data_processing import (
+    load_data,
+    loads_json,
+    filter_data,
+    filter_key,
+    filtered_entity_counts,
+    memoize_per_frame,
+    top_entity,
+    entity_options
+)
 from src.visualizations import (
     create_timeline,
     create_sunburst,
@@ -10,7 +20,6 @@ from src.visualizations import (
     create_wordcloud_scatter
 )
 from src.ai_service import get_ai_service
-import dash_bootstrap_components as dbc
 from datetime import datetime
 
 # Load data once at module level (cached)
@@ -34,91 +43,103 @@ def initialize_filters(_):
     min_date = df['date'].min()
     max_date = df['date'].max()
     
-    # Get top 100 keywords for dropdown to avoid overcrowding
-    all_kws = explode_entities(df, 'kws').value_counts().head(100).index.tolist()
-    kw_options = [{'label': k, 'value': k} for k in all_kws]
+    # Get top 100 keywords for dropdown to avoid overcrowding (ranked once, then cached)
+    kw_options = entity_options('kws', 100)
     
     # Get top 50 locations
-    all_locs = explode_entities(df, 'loc').value_counts().head(50).index.tolist()
-    loc_options = [{'label': l, 'value': l} for l in all_locs]
+    loc_options = entity_options('loc', 50)
     
     return min_date, max_date, min_date, max_date, kw_options, loc_options
 
 # --- Cross-Filtering & Visualization Callbacks ---
 
 @callback(
-    [
-        Output('kpi-total-articles', 'children'),
-        Output('kpi-top-kw', 'children'),
-        Output('kpi-top-person', 'children'),
-        Output('kpi-top-org', 'children'),
-        Output('timeline-graph', 'figure'),
-        Output('top-persons-graph', 'figure'),
-        Output('top-locations-graph', 'figure'),
-        Output('wordcloud-graph', 'figure'),
-        Output('sunburst-graph', 'figure'),
-        Output('heatmap-graph', 'figure')
-    ],
-    [
-        Input('date-picker-range', 'start_date'),
-        Input('date-picker-range', 'end_date'),
-        Input('dropdown-kws', 'value'),
-        Input('dropdown-loc', 'value'),
-        Input('filter-reset-btn', 'n_clicks'),
-        # Add interactive clicks from graphs
-        Input('top-persons-graph', 'clickData'),
-        Input('sunburst-graph', 'clickData')
-    ]
+    Output('filter-selection', 'data'),
+    Input('date-picker-range', 'start_date'),
+    Input('date-picker-range', 'end_date'),
+    Input('dropdown-kws', 'value'),
+    Input('dropdown-loc', 'value'),
+    State('filter-selection', 'data')
 )
-def update_all_charts(start_date, end_date, selected_kws, selected_locs, reset_clicks, bar_click, sunburst_click):
+def update_filter_selection(start_date, end_date, selected_kws, selected_locs, current_selection):
     """
-    Main callback that updates everything based on filters.
-    Handles cross-filtering priority.
+    Publishes the current filter selection (a few strings, not the filtered rows).
+    KPIs and charts listen to this store; an unchanged selection does not re-trigger them.
     """
-    # Determine what triggered the callback
-    triggered_id = ctx.triggered_id
-    
-    # Handle Reset
-    if triggered_id == 'filter-reset-btn':
-        pass
+    selection = {
+        'start_date': start_date,
+        'end_date': end_date,
+        'keywords': sorted(set(selected_kws or [])),
+        'locations': sorted(set(selected_locs or []))
+    }
+    if selection == current_selection:
+        return no_update
+    return selection
+
+def selected_data(selection):
+    """
+    Rows matching a published selection (filter results are memoized server-side).
+    """
+    if selection is None:
+        raise PreventUpdate
+    return filter_data(df, selection['start_date'], selection['end_date'],
+                       selection['keywords'], selection['locations'])
 
-    # Start with global filters
-    dff = filter_data(df, start_date, end_date, selected_kws, selected_locs)
-    
-    # --- KPIs ---
+@callback(
+    Output('kpi-total-articles', 'children'),
+    Output('kpi-top-kw', 'children'),
+    Output('kpi-top-person', 'children'),
+    Output('kpi-top-org', 'children'),
+    Input('filter-selection', 'data')
+)
+def update_kpis(selection):
+    dff = selected_data(selection)
     total_articles = f"{len(dff):,}".replace(",", " ")
     
-    top_kw = "N/A"
-    if not dff.empty:
-        kws = explode_entities(dff, 'kws')
-        if selected_kws:
-            kws = kws[~kws.isin(selected_kws)]
-        if not kws.empty:
-            top_kw = kws.mode()[0]
-            
-    top_person = "N/A"
-    if not dff.empty:
-        pers = explode_entities(dff, 'per')
-        if not pers.empty:
-            top_person = pers.mode()[0]
-    
-    top_org = "N/A"
+    # Top entity per column from the memoized counts (selected keywords are not a "top" keyword)
+    filters = (selection['start_date'], selection['end_date'], selection['keywords'], selection['locations'])
+    top_kw = top_person = top_org = "N/A"
     if not dff.empty:
-        orgs = explode_entities(dff, 'org')
-        if not orgs.empty:
-            top_org = orgs.mode()[0]
+        top_kw, top_person, top_org = (
+            top_entity(filtered_entity_counts(df, col, *filters), exclude) or "N/A"
+            for col, exclude in [('kws', selection['keywords']), ('per', None), ('org', None)]
+        )
+    return total_articles, top_kw, top_person, top_org
 
-    # --- Charts ---
-    fig_timeline = create_timeline(dff)
-    fig_top_persons = create_top_persons_bar(dff)
-    fig_top_locations = create_top_locations_bar(dff)
-    fig_wordcloud = create_wordcloud_scatter(dff)
-    fig_sunburst = create_sunburst(dff)
-    fig_heatmap = create_cooccurrence_heatmap(dff)
-    
-    return (total_articles, top_kw, top_person, top_org, 
-            fig_timeline, fig_top_persons, fig_top_locations, fig_wordcloud, 
-            fig_sunburst, fig_heatmap)
+# Built figures remembered per chart and filter selection, shared by every browser
+# connected to this process
+FIGURE_CACHE_SIZE = 256
+
+def figure_payload(fig):
+    """
+    A figure as JSON-ready builtins: numpy arrays already encoded as typed arrays
+    (plotly's 'bdata'), so answering from the cache only dumps plain dicts and strings.
+    Plotly encodes with orjson when it is installed.
+    """
+    return loads_json(fig.to_json())
+
+# One callback per figure: each chart is rebuilt on its own request
+CHART_BUILDERS = {
+    'timeline-graph': create_timeline,
+    'top-persons-graph': create_top_persons_bar,
+    'top-locations-graph': create_top_locations_bar,
+    'wordcloud-graph': create_wordcloud_scatter,
+    'sunburst-graph': create_sunburst,
+    'heatmap-graph': create_cooccurrence_heatmap
+}
+
+def register_chart_callback(graph_id, build):
+    @callback(Output(graph_id, 'figure'), Input('filter-selection', 'data'))
+    def update_chart(selection):
+        if selection is None:
+            raise PreventUpdate
+        key = (graph_id, filter_key(**selection))
+        return memoize_per_frame(df, 'figures', key, lambda: figure_payload(build(selected_data(selection))),
+                                 maxsize=FIGURE_CACHE_SIZE)
+    return update_chart
+
+for graph_id, build in CHART_BUILDERS.items():
+    register_chart_callback(graph_id, build)
 
 # --- Reset Filter Logic (Separate for updating Input components) ---
 @callback(
@@ -138,16 +159,13 @@ def reset_filters(n_clicks):
     Input('ai-submit-btn', 'n_clicks'),
     State('ai-input', 'value'),
     State('ai-chat-history', 'data'),
-    State('date-picker-range', 'start_date'),
-    State('date-picker-range', 'end_date'),
-    State('dropdown-kws', 'value'),
-    State('dropdown-loc', 'value'),
+    State('filter-selection', 'data'),
     prevent_initial_call=True
 )
-def ai_analyst_query(n_clicks, query, chat_history, start_date, end_date, selected_kws, selected_locs):
+def ai_analyst_query(n_clicks, query, chat_history, selection):
     """
     Context-aware AI callback that uses Groq API.
-    Filters data based on current dashboard state and sends to AI.
+    Sends the rows of the current filter selection (the same memoized rows as the charts) to AI.
     """
     if not query or not query.strip():
         return no_update, no_update
@@ -157,16 +175,11 @@ def ai_analyst_query(n_clicks, query, chat_history, start_date, end_date, select
         chat_history = []
 
     try:
-        # Filter data based on current dashboard state
-        filtered_df = filter_data(df, start_date, end_date, selected_kws, selected_locs)
+        # Rows of the published selection: the filter result is already memoized
+        filtered_df = selected_data(selection)
 
-        # Prepare filter info for context
-        filters = {
-            'start_date': start_date,
-            'end_date': end_date,
-            'keywords': selected_kws or [],
-            'locations': selected_locs or []
-        }
+        # The selection already holds the filter info for context
+        filters = selection
 
         # Get AI service instance
         ai_service = get_ai_service()
@@ -202,6 +215,9 @@ def ai_analyst_query(n_clicks, query, chat_history, start_date, end_date, select
         # Clear input and return updated history
         return chat_history, ""
 
+    except PreventUpdate:
+        # No selection published yet: leave the chat untouched
+        raise
     except Exception as e:
         # Handle unexpected errors
         error_msg = f"Erreur lors de la génération de la réponse : {str(e)}"
@@ -218,74 +234,13 @@ def ai_analyst_query(n_clicks, query, chat_history, start_date, end_date, select
         return chat_history, ""
 
 
-@callback(
+# Rendered in the browser (assets/chat_history.js): only newly appended messages
+# are built, without a server round trip to render the history
+clientside_callback(
+    ClientsideFunction(namespace='chat', function_name='render_history'),
     Output('ai-chat-history-display', 'children'),
     Input('ai-chat-history', 'data')
 )
-def display_chat_history(chat_history):
-    """
-    Displays the chat history in a formatted way.
-    """
-    if not chat_history:
-        return html.P(
-            "Aucun message. Posez une question pour commencer !",
-            className="text-muted text-center",
-            style={'marginTop': '100px'}
-        )
-
-    messages = []
-    for msg in chat_history:
-        role = msg.get('role', 'user')
-        content = msg.get('content', '')
-        timestamp = msg.get('timestamp', '')
-
-        # Format timestamp
-        try:
-            dt = datetime.fromisoformat(timestamp)
-            time_str = dt.strftime('%H:%M:%S')
-        except:
-            time_str = ''
-
-        if role == 'user':
-            # User message (right-aligned, blue)
-            message_div = html.Div([
-                html.Div([
-                    html.Small(time_str, className="text-muted d-block mb-1"),
-                    html.Div(content, className="p-2 rounded", style={
-                        'backgroundColor': '#0d6efd',
-                        'color': '#fff',
-                        'display': 'inline-block',
-                        'maxWidth': '80%'
-                    })
-                ], style={'textAlign': 'right'})
-            ], className="mb-3")
-        elif role == 'assistant':
-            # AI message (left-aligned, green)
-            message_div = html.Div([
-                html.Div([
-                    html.Small(time_str, className="text-muted d-block mb-1"),
-                    dbc.Alert(content, color="success", className="mb-0", style={
-                        'whiteSpace': 'pre-wrap',
-                        'maxWidth': '90%',
-                        'display': 'inline-block'
-                    })
-                ], style={'textAlign': 'left'})
-            ], className="mb-3")
-        else:  # error
-            # Error message (left-aligned, red)
-            message_div = html.Div([
-                html.Div([
-                    html.Small(time_str, className="text-muted d-block mb-1"),
-                    dbc.Alert(content, color="danger", className="mb-0", style={
-                        'maxWidth': '90%',
-                        'display': 'inline-block'
-                    })
-                ], style={'textAlign': 'left'})
-            ], className="mb-3")
-
-        messages.append(message_div)
-
-    return messages
 
 
 @callback(
@@ -1,34 +1,216 @@
 import pandas as pd
 import ast
+import json
+import os
+import pickle
+import threading
+import weakref
+from collections import OrderedDict, namedtuple
 from functools import lru_cache
 import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+# orjson parses list cells far faster than ast.literal_eval; json is the fallback
+try:
+    import orjson
+    loads_json = orjson.loads
+except ImportError:
+    loads_json = json.loads
+
+LIST_COLUMNS = ['kws', 'loc', 'org', 'per']
+
+# List columns are held as Arrow lists of dictionary-encoded strings: each distinct
+# entity is stored once and rows only hold small integer codes
+ENTITY_LIST_DTYPE = pd.ArrowDtype(pa.list_(pa.dictionary(pa.int32(), pa.string())))
+
+# Fully prepared dataset pickled next to the CSV, reused while its source file is unchanged
+FRAME_CACHE_SUFFIX = '.cache.pkl'
+# Part of the cache signature: bump it whenever prepare_data changes the prepared
+# layout (columns, dtypes), so caches written by older code are rebuilt
+CACHE_VERSION = 1
+
+# Derived structures per dataframe (inverted indexes, filter results...),
+# dropped when the dataframe is garbage collected
+_frame_caches = {}
+# Chart callbacks run concurrently: guards the cache dicts (computations run outside it)
+_frame_caches_lock = threading.Lock()
+
+# Number of filter selections (and their entity counts) remembered per dataframe
+FILTER_CACHE_SIZE = 64
+# Filtered frames (and the structures derived from them) are larger: fewer are kept
+FILTERED_FRAME_CACHE_SIZE = 8
+
+# Documents per block of the co-occurrence document-term matrix (keeps it a few MB)
+COOC_BLOCK_DOCS = 50_000
+
+# Boolean rows x entities presence matrix of a list column, in compressed sparse column
+# form (scipy is not a dependency): the rows containing vocab[j] are rows[indptr[j]:indptr[j + 1]]
+EntityPresence = namedtuple('EntityPresence', ['vocab', 'indptr', 'rows'])
+
+# Entity counts of a list column aggregated per date, sorted by date: on dates[i], vocab[codes[i]]
+# is mentioned counts[i] times, first as the first_seen[i]-th mention of the flattened column
+EntityDateCounts = namedtuple('EntityDateCounts', ['vocab', 'dates', 'codes', 'counts', 'first_seen'])
+
+def parse_list(value):
+    """
+    Returns a list cell as a plain Python list.
+    Handles stringified lists (CSV), arrays (Parquet) and missing values (empty list).
+    Strings are decoded as JSON first; Python reprs that are not valid JSON
+    (e.g. a quote inside a value) go through ast.literal_eval.
+    """
+    if isinstance(value, str):
+        if not value.startswith('['):
+            return []
+        try:
+            return loads_json(value)
+        except ValueError:
+            return ast.literal_eval(value)
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return list(value)
+    return []
+
+def parse_list_column(series):
+    """
+    Parses a whole list column at once.
+    Python reprs without any double quote use single quotes only as delimiters,
+    so a single vectorized replace turns them into JSON.
+    """
+    if pd.api.types.is_string_dtype(series):
+        series = series.fillna('[]')
+        has_double_quote = series.str.contains('"', regex=False)
+        series = series.where(has_double_quote, series.str.replace("'", '"', regex=False))
+    return [parse_list(v) for v in series]
+
+def to_entity_lists(series):
+    """
+    Converts a list column (Python lists, stringified lists or Arrow lists) to ENTITY_LIST_DTYPE.
+    """
+    if isinstance(series.dtype, pd.ArrowDtype):
+        return series.astype(ENTITY_LIST_DTYPE)
+    lists = pa.array(parse_list_column(series), type=pa.list_(pa.string()))
+    return pd.Series(pd.arrays.ArrowExtensionArray(lists.cast(ENTITY_LIST_DTYPE.pyarrow_dtype)),
+                     index=series.index, name=series.name)
+
+def read_parquet_lists(path):
+    """
+    Reads a Parquet file, keeping list columns as Arrow lists (no Python list per row).
+    """
+    return pq.read_table(path).to_pandas(
+        types_mapper=lambda t: pd.ArrowDtype(t) if pa.types.is_list(t) else None
+    )
+
+def day_index(dates):
+    """
+    Day number of each date (days since 1970-01-01) as int32, for bincount-based histograms.
+    """
+    return dates.to_numpy().astype('datetime64[D]').astype(np.int32)
+
+def date_ns(dates):
+    """
+    Dates as int64 nanoseconds since the epoch (NaT becomes the smallest int64),
+    so range filters are plain integer comparisons.
+    """
+    return dates.to_numpy().astype('datetime64[ns]').view(np.int64)
+
+def timestamp_ns(value):
+    """
+    A date bound (string, date or Timestamp) as int64 nanoseconds since the epoch.
+    """
+    return pd.Timestamp(value).as_unit('ns').value
+
+def source_signature(path):
+    """
+    Identifies the version of a source file and of its prepared layout:
+    (CACHE_VERSION, library versions, absolute path, mtime in ns, size).
+    Pickled Arrow and categorical columns are not portable across pandas/pyarrow/numpy
+    releases, so upgrading any of them invalidates the cache.
+    """
+    stat = os.stat(path)
+    return (CACHE_VERSION, (pd.__version__, pa.__version__, np.__version__),
+            os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+
+def read_frame_cache(cache_path, signature):
+    """
+    Returns the pickled dataset if it was built from the source version signature, else None.
+    The signature is pickled first, so a stale cache is rejected without loading the frame;
+    a cache that fails to unpickle for any reason is a miss as well (it gets rewritten).
+    """
+    try:
+        with open(cache_path, 'rb') as f:
+            if pickle.load(f) != signature:
+                return None
+            return pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"Warning: ignoring unreadable cache {cache_path}: {e}")
+        return None
+
+def write_frame_cache(cache_path, signature, df):
+    """
+    Pickles the prepared dataset (protocol 5: array buffers are written without extra copies).
+    Failures are only reported: the cache is best effort.
+    """
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(signature, f, protocol=5)
+            pickle.dump(df, f, protocol=5)
+        os.replace(tmp_path, cache_path)  # Atomic, so concurrent workers never read a partial file
+    except (OSError, pickle.PicklingError) as e:
+        print(f"Warning: could not write cache {cache_path}: {e}")
+
+def prepare_data(source):
+    """
+    Reads a source file (CSV or Parquet) and performs the initial preprocessing.
+    """
+    if source.endswith('.parquet'):
+        df = read_parquet_lists(source)
+    else:
+        # Multi-threaded Arrow CSV reader; dates stay text so pd.to_datetime parses them as before
+        df = pd.read_csv(source, engine='pyarrow', dtype={'date': 'str'})
+    
+    # Convert date column
+    df['date'] = pd.to_datetime(df['date'])
+    # Day numbers precomputed once, so per-day histograms never re-derive them
+    df['day_idx'] = day_index(df['date'])
+    # Same for the range filter: dates as int64 ns, compared without Timestamp coercion
+    df['date_ns'] = date_ns(df['date'])
+    
+    # Cols that need parsing from string representation of list to actual list
+    for col in LIST_COLUMNS:
+        if col in df.columns:
+            # Dictionary-encoded Arrow lists; NaNs become empty lists
+            df[col] = to_entity_lists(df[col])
+    
+    # Fill NaN for text content just in case
+    if 'content' in df.columns:
+        df['content'] = df['content'].fillna('')
+    return df
 
 # Use lru_cache to load data once into memory
 @lru_cache(maxsize=1)
 def load_data(filepath='data/processed/clean_data.csv'):
     """
     Loads the dataset and performs initial preprocessing.
+    Prefers the Parquet output of preprocessing.py (same name, .parquet) when it exists.
     Parses stringified lists in 'kws', 'loc', 'org', 'per'.
     Converts 'date' to datetime objects.
+    The prepared frame is pickled next to the CSV and reused by later process starts
+    (reloader, other workers) until the source file changes.
     """
     try:
-        df = pd.read_csv(filepath)
-        
-        # Convert date column
-        df['date'] = pd.to_datetime(df['date'])
+        parquet_path = os.path.splitext(filepath)[0] + '.parquet'
+        source = parquet_path if os.path.exists(parquet_path) else filepath
+        signature = source_signature(source)
         
-        # Cols that need parsing from string representation of list to actual list
-        list_cols = ['kws', 'loc', 'org', 'per']
-        for col in list_cols:
-            if col in df.columns:
-                # ast.literal_eval safely evaluates a string containing a generic Python literal
-                # We handle NaNs by treating them as empty lists
-                df[col] = df[col].apply(lambda x: ast.literal_eval(x) if pd.notnull(x) and isinstance(x, str) and x.startswith('[') else [])
-        
-        # Fill NaN for text content just in case
-        if 'content' in df.columns:
-            df['content'] = df['content'].fillna('')
-            
+        cache_path = os.path.splitext(filepath)[0] + FRAME_CACHE_SUFFIX
+        df = read_frame_cache(cache_path, signature)
+        if df is None:
+            df = prepare_data(source)
+            write_frame_cache(cache_path, signature, df)
         return df
     except FileNotFoundError:
         print(f"Error: File not found at {filepath}")
@@ -37,63 +219,343 @@ def load_data(filepath='data/processed/clean_data.csv'):
         print(f"Error loading data: {e}")
         return pd.DataFrame()
 
-def explode_entities(df, column):
+def entity_list_array(series):
+    """
+    A list column as a single Arrow array of dictionary-encoded lists.
+    """
+    if series.dtype != ENTITY_LIST_DTYPE:
+        series = to_entity_lists(series)
+    lists = pa.array(series.array)
+    if isinstance(lists, pa.ChunkedArray):
+        lists = lists.combine_chunks()  # also unifies the chunks' dictionaries
+    return lists
+
+def flatten_entities(series):
+    """
+    Flattens a list column in Arrow (no Python objects per row).
+    Returns (positions, codes, entities): the i-th entity found is entities[codes[i]],
+    in the row at position positions[i].
+    """
+    lists = entity_list_array(series)
+    flat = pc.list_flatten(lists)
+    positions = pc.list_parent_indices(lists).to_numpy()
+    codes = flat.indices.to_numpy(zero_copy_only=False)
+    entities = flat.dictionary.to_numpy(zero_copy_only=False)
+    return positions, codes, entities
+
+def head_entities(series, n, fallback):
+    """
+    The first n entities of each row of a list column, flattened in row order;
+    a row without any entity contributes fallback instead.
+    Returns (positions, entities) as numpy arrays.
+    """
+    lists = entity_list_array(series)
+    heads = pc.list_slice(lists, 0, n)
+    flat = pc.list_flatten(heads)
+    positions = pc.list_parent_indices(heads).to_numpy()
+    entities = flat.dictionary.to_numpy(zero_copy_only=False)[flat.indices.to_numpy(zero_copy_only=False)]
+    empty = np.flatnonzero(pc.fill_null(pc.list_value_length(lists), 0).to_numpy(zero_copy_only=False) == 0)
+    if len(empty):
+        positions = np.concatenate([positions, empty])
+        entities = np.concatenate([entities, np.full(len(empty), fallback, dtype=object)])
+        order = np.argsort(positions, kind='stable')
+        positions, entities = positions[order], entities[order]
+    return positions, entities
+
+def rank_codes(codes, n=None, weights=None):
+    """
+    Distinct codes sorted by decreasing count, ties in order of first appearance
+    (the order of Counter.most_common). Returns (codes, counts).
+    With n, only the n most frequent are kept: a partition selects them, and only
+    those are sorted. With integer weights, each occurrence counts weights[i] times.
+    """
+    unique, first = np.unique(codes, return_index=True)
+    if len(codes):
+        counts = np.bincount(codes, weights)[unique].astype('int64')
+    else:
+        counts = np.zeros(0, dtype='int64')
+    if n == 0:
+        return unique[:0], counts[:0]
+    if n is not None and n < len(unique):
+        # Every code tied with the n-th largest count stays a candidate
+        nth = np.partition(counts, len(counts) - n)[len(counts) - n]
+        keep = counts >= nth
+        unique, first, counts = unique[keep], first[keep], counts[keep]
+    order = np.lexsort((first, -counts))[:n]
+    return unique[order], counts[order]
+
+def entity_value_counts(df, column, n=None):
+    """
+    Counts the entities of a list column, like explode().value_counts() but on integer codes.
+    With n, only the n most frequent, like value_counts().head(n) without sorting the rest.
+    """
+    if column not in df.columns:
+        return pd.Series(dtype='int64', name='count')
+    _, codes, entities = frame_entities(df, column)
+    ranked, counts = rank_codes(codes, n)
+    return pd.Series(counts.astype('int64'), index=pd.Index(entities[ranked], dtype='object', name=column), name='count')
+
+@lru_cache(maxsize=None)
+def top_entities(column, n):
+    """
+    Returns the n most frequent entities of a list column of the loaded dataset.
+    The dataset never changes while the app runs, so each ranking is computed once.
+    """
+    return tuple(entity_value_counts(load_data(), column, n).index)
+
+@lru_cache(maxsize=None)
+def entity_options(column, n):
+    """
+    Dropdown options ({'label', 'value'} dicts) for the n most frequent entities of a column.
+    Built once and shared by every page load.
+    """
+    return [{'label': k, 'value': k} for k in top_entities(column, n)]
+
+def top_entity(counts, exclude=None):
+    """
+    Most frequent entity of a counts Series, skipping the values in exclude.
+    One argmax-style pass instead of mode(), which sorts every value;
+    ties go to the smallest value, as with mode(). Returns None if nothing is left.
+    """
+    values = counts.to_numpy()
+    if exclude:
+        # Masked out rather than dropped: no copy of the counts Series
+        values = np.where(counts.index.isin(exclude), -1, values)
+    if not len(values) or values.max() < 0:
+        return None
+    return min(counts.index[values == values.max()])
+
+def count_entities(df, columns):
+    """
+    Counts entity mentions for several list columns at once.
+    Returns a dict {column: Series of counts sorted in descending order}.
+    """
+    return {column: entity_value_counts(df, column) for column in columns}
+
+def build_presence_matrix(df, column):
+    """
+    Builds the presence matrix of a list column from its flattened (row, entity code) pairs.
+    """
+    positions, codes, entities = frame_entities(df, column)
+    order = np.argsort(codes, kind='stable')
+    indptr = np.concatenate([[0], np.cumsum(np.bincount(codes, minlength=len(entities)))])
+    return EntityPresence(pd.Index(entities, dtype='object'), indptr, positions[order])
+
+def build_date_counts(df, column):
+    """
+    Aggregates the flattened (row, entity code) pairs of a list column into per-date counts.
+    """
+    positions, codes, entities = frame_entities(df, column)
+    dates = df['date_ns'].to_numpy()[positions]
+    order = np.lexsort((codes, dates))  # stable: mentions of a group stay in column order
+    dates, codes = dates[order], codes[order]
+    # A new (date, code) group starts wherever either changes
+    starts = np.flatnonzero(np.concatenate([[True], (dates[1:] != dates[:-1]) | (codes[1:] != codes[:-1])]))
+    counts = np.diff(np.append(starts, len(codes)))
+    return EntityDateCounts(entities, dates[starts], codes[starts], counts, order[starts])
+
+def get_date_counts(df, column):
+    """
+    Returns the per-date entity counts of a list column, built once per dataframe.
+    """
+    cache = frame_cache(df)
+    key = ('date_counts', column)
+    if key not in cache:
+        cache[key] = build_date_counts(df, column)
+    return cache[key]
+
+def date_range_entity_counts(df, column, start_date=None, end_date=None):
     """
-    Explodes validity of a list column to allow counting individual entities.
-    Returns a Series of all entities found in that column.
+    Entity counts over a date range (all rows without one), summed from the per-date
+    counts instead of exploding the matching rows. Same result as entity_value_counts.
     """
     if column not in df.columns:
-        return pd.Series(dtype='object')
-    return df[column].explode().dropna()
+        return pd.Series(dtype='int64', name='count')
+    agg = get_date_counts(df, column)
+    lo, hi = 0, len(agg.dates)
+    if start_date and end_date:
+        lo = np.searchsorted(agg.dates, timestamp_ns(start_date), side='left')
+        hi = np.searchsorted(agg.dates, timestamp_ns(end_date), side='right')
+    codes = agg.codes[lo:hi]
+    totals = np.bincount(codes, weights=agg.counts[lo:hi], minlength=len(agg.vocab)).astype('int64')
+    # Ties keep the order of first mention, as in entity_value_counts
+    first = np.full(len(agg.vocab), np.iinfo(np.int64).max)
+    np.minimum.at(first, codes, agg.first_seen[lo:hi])
+    present = np.flatnonzero(totals)
+    order = np.lexsort((first[present], -totals[present]))
+    ranked = present[order]
+    return pd.Series(totals[ranked], index=pd.Index(agg.vocab[ranked], dtype='object', name=column), name='count')
+
+def frame_cache(df):
+    """
+    Returns the dict of derived structures attached to a dataframe.
+    Dataframes are treated as immutable once cached (the loaded dataset is never modified).
+    """
+    with _frame_caches_lock:
+        cache = _frame_caches.get(id(df))
+        if cache is None:
+            cache = _frame_caches[id(df)] = {}
+            weakref.finalize(df, _frame_caches.pop, id(df), None)
+        return cache
+
+def frame_entities(df, column):
+    """
+    flatten_entities of a list column, computed once per dataframe and shared by
+    every count, ranking and matrix built from it. The arrays are read-only.
+    """
+    cache = frame_cache(df)
+    key = ('flat_entities', column)
+    if key not in cache:
+        flat = flatten_entities(df[column])
+        for array in flat:
+            array.flags.writeable = False
+        cache[key] = flat
+    return cache[key]
+
+def get_presence_matrix(df, column):
+    """
+    Returns the presence matrix of a list column, built once per dataframe.
+    """
+    cache = frame_cache(df)
+    key = ('presence_matrix', column)
+    if key not in cache:
+        cache[key] = build_presence_matrix(df, column)
+    return cache[key]
+
+def memoize_per_frame(df, name, key, compute, maxsize=FILTER_CACHE_SIZE):
+    """
+    LRU memo of maxsize results attached to df: returns the value stored
+    under key, calling compute() on a miss.
+    """
+    cache = frame_cache(df)
+    with _frame_caches_lock:
+        memo = cache.setdefault(name, OrderedDict())
+        if key in memo:
+            memo.move_to_end(key)
+            return memo[key]
+    value = compute()
+    with _frame_caches_lock:
+        memo[key] = value
+        if len(memo) > maxsize:
+            memo.popitem(last=False)
+    return value
+
+def entity_mask(df, column, entities):
+    """
+    Boolean array over the rows of df: True where the list column contains any of entities,
+    i.e. the any() across the selected columns of the presence matrix.
+    Cost depends on the number of matching rows, not on the size of df.
+    """
+    presence = get_presence_matrix(df, column)
+    cols = presence.vocab.get_indexer(list(entities))
+    mask = np.zeros(len(df), dtype=bool)
+    for j in cols[cols >= 0]:
+        mask[presence.rows[presence.indptr[j]:presence.indptr[j + 1]]] = True
+    return mask
 
 def compute_cooccurrence_matrix(df, entity_col='kws', top_n=30):
     """
     Computes a co-occurrence matrix for the top_n most frequent entities in a column.
     Useful for heatmaps.
     """
-    # Filter valid lists
-    docs = df[entity_col].dropna()
+    positions, codes, entities = frame_entities(df, entity_col)
     
     # Get top N entities to keep matrix manageable
-    all_entities = docs.explode().value_counts().head(top_n).index.tolist()
+    top_codes = rank_codes(codes, top_n)[0]
+    all_entities = entities[top_codes].tolist()
     
-    # Filter inner lists to only contain top entities
-    filtered_docs = docs.apply(lambda x: [i for i in x if i in all_entities])
+    # Document-term count matrix restricted to the top entities and to the documents
+    # mentioning at least one of them (scipy is not a dependency; this dense matrix is small enough)
+    entity_ids = np.full(len(entities), -1)
+    entity_ids[top_codes] = np.arange(len(top_codes))
+    cols = entity_ids[codes]
+    keep = cols >= 0
+    docs, doc_rows = np.unique(positions[keep], return_inverse=True)
+    k = len(all_entities)
+    cells = doc_rows * k + cols[keep]
     
-    # Create co-occurrence matrix
-    cooc_mat = pd.DataFrame(0, index=all_entities, columns=all_entities)
-    
-    for doc in filtered_docs:
-        for i in range(len(doc)):
-            for j in range(i + 1, len(doc)):
-                e1, e2 = doc[i], doc[j]
-                # Increment both ways for symmetry
-                cooc_mat.loc[e1, e2] += 1
-                cooc_mat.loc[e2, e1] += 1
+    # Each unordered pair of positions in a document counts once in both directions:
+    # counts.T @ counts gives c_a * c_b off the diagonal and c_a^2 on it,
+    # where pairs of the same entity only contribute c_a * (c_a - 1).
+    # Documents are taken COOC_BLOCK_DOCS at a time (doc_rows is sorted) to bound the dense matrix.
+    cooc = np.zeros((k, k))
+    for start in range(0, len(docs), COOC_BLOCK_DOCS):
+        lo, hi = np.searchsorted(doc_rows, [start, start + COOC_BLOCK_DOCS])
+        block = min(COOC_BLOCK_DOCS, len(docs) - start)
+        # One bincount over flat (document, entity) cells instead of an unbuffered np.add.at
+        counts = np.bincount(cells[lo:hi] - start * k, minlength=block * k).reshape(block, k).astype(float)
+        cooc += counts.T @ counts
+    cooc[np.diag_indices_from(cooc)] -= np.bincount(cols[keep], minlength=k)
                 
-    return cooc_mat
+    return pd.DataFrame(cooc.astype('int64'), index=all_entities, columns=all_entities)
 
-def filter_data(df, start_date=None, end_date=None, keywords=None, locations=None):
+def filter_key(start_date=None, end_date=None, keywords=None, locations=None):
+    """
+    Hashable signature of a filter selection (order of selected values does not matter).
+    """
+    return (start_date, end_date, tuple(sorted(set(keywords or ()))), tuple(sorted(set(locations or ()))))
+
+def filter_indices(df, start_date=None, end_date=None, keywords=None, locations=None):
+    """
+    Row positions of df matching the filters, memoized by filter signature.
+    Only the positions are kept (not the filtered frames) so memory stays bounded.
+    """
+    key = filter_key(start_date, end_date, keywords, locations)
+    return memoize_per_frame(df, 'filter_indices', key,
+                             lambda: compute_filter_indices(df, start_date, end_date, keywords, locations))
+
+def compute_filter_indices(df, start_date=None, end_date=None, keywords=None, locations=None):
     """
-    Generic filtering function for cross-filtering.
-    keywords and locations should be lists of strings to match.
     Logic is OR within a category (if any match), AND across categories.
+    Returns a read-only array of row positions.
     """
-    dff = df.copy()
+    # All conditions are ANDed into one mask over df, applied once at the end
+    mask = np.ones(len(df), dtype=bool)
     
     # Date Filter
     if start_date and end_date:
-        dff = dff[(dff['date'] >= start_date) & (dff['date'] <= end_date)]
-        
+        dates = df['date_ns'].to_numpy()
+        mask &= (dates >= timestamp_ns(start_date)) & (dates <= timestamp_ns(end_date))
+    
     # Keyword Filter (if any selected keyword is in the article's kws list)
     if keywords:
-        # Check if set intersection is not empty
-        kws_set = set(keywords)
-        dff = dff[dff['kws'].apply(lambda x: not kws_set.isdisjoint(x))]
+        mask &= entity_mask(df, 'kws', keywords)
         
     # Location Filter
     if locations:
-        locs_set = set(locations)
-        dff = dff[dff['loc'].apply(lambda x: not locs_set.isdisjoint(x))]
-        
-    return dff
+        mask &= entity_mask(df, 'loc', locations)
+    
+    positions = np.flatnonzero(mask)
+    positions.flags.writeable = False
+    return positions
+
+def filter_data(df, start_date=None, end_date=None, keywords=None, locations=None):
+    """
+    Generic filtering function for cross-filtering.
+    keywords and locations should be lists of strings to match.
+    Logic is OR within a category (if any match), AND across categories.
+    """
+    def compute():
+        positions = filter_indices(df, start_date, end_date, keywords, locations)
+        # Nothing filtered out: a lazy copy-on-write slice instead of copying every column
+        if len(positions) == len(df):
+            return df.iloc[:]
+        return df.iloc[positions]
+    # The same frame object for a given selection, so every chart reuses what was
+    # derived from it (flattened entities...) instead of recomputing it
+    key = filter_key(start_date, end_date, keywords, locations)
+    return memoize_per_frame(df, 'filtered_frames', key, compute, maxsize=FILTERED_FRAME_CACHE_SIZE)
+
+def filtered_entity_counts(df, column, start_date=None, end_date=None, keywords=None, locations=None):
+    """
+    Entity counts (value_counts of the exploded column) over the rows matching the filters,
+    memoized by filter signature. Date-only selections are answered from the per-date counts.
+    """
+    key = (filter_key(start_date, end_date, keywords, locations), column)
+    if not keywords and not locations:
+        return memoize_per_frame(df, 'entity_counts', key, lambda: date_range_entity_counts(
+            df, column, start_date, end_date
+        ))
+    return memoize_per_frame(df, 'entity_counts', key, lambda: entity_value_counts(
+        df.iloc[filter_indices(df, start_date, end_date, keywords, locations)], column
+    ))
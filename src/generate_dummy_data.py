@@ -1,48 +1,52 @@
 import pandas as pd
 import numpy as np
-import random
-from datetime import datetime, timedelta
+from datetime import datetime
 
-def generate_dummy_data(n=1000):
+def sample_lists(rng, pool, sizes):
+    """
+    Draws one list per row, of sizes[i] distinct elements of pool, with a single
+    random matrix for all rows (argsort of random keys = a shuffle per row).
+    """
+    if len(sizes) == 0:
+        return []
+    pool = np.asarray(pool, dtype=object)
+    picks = pool[rng.random((len(sizes), len(pool))).argsort(axis=1)[:, :sizes.max()]]
+    return [row[:k].tolist() for row, k in zip(picks, sizes)]
+
+def generate_dummy_data(n=1000, seed=None):
     print(f"Generating {n} dummy articles...")
+    rng = np.random.default_rng(seed)
     
     # Setup data
-    start_date = datetime(2022, 1, 1)
-    dates = [start_date + timedelta(days=random.randint(0, 700)) for _ in range(n)]
+    start_date = np.datetime64(datetime(2022, 1, 1), 'D')
+    dates = start_date + rng.integers(0, 701, size=n).astype('timedelta64[D]')
     
     topics = ['Politique', 'Économie', 'Santé', 'Sport', 'Culture', 'Technologie', 'Environnement']
     locations = ['Paris', 'Londres', 'Washington', 'Moscou', 'Pékin', 'Bruxelles', 'Berlin', 'Dakar', 'Alger']
     orgs = ['ONU', 'UE', 'OTAN', 'OMS', 'FMI', 'Google', 'Tesla', 'Total', 'Sanofi']
     persons = ['Macron', 'Biden', 'Poutine', 'Zelensky', 'Musk', 'Mbappé', 'Von der Leyen', 'Xi Jinping']
     
-    data = []
+    # Draw every row at once; list lengths follow the same ranges as before
+    main_topics = np.asarray(topics, dtype=object)[rng.integers(0, len(topics), size=n)]
+    kws = [[topic] + extra for topic, extra in zip(main_topics, sample_lists(rng, topics, rng.integers(0, 3, size=n)))]
+    loc = sample_lists(rng, locations, rng.integers(1, 4, size=n))
+    org = sample_lists(rng, orgs, rng.integers(0, 3, size=n))
+    per = sample_lists(rng, persons, rng.integers(0, 3, size=n))
+    
+    df = pd.DataFrame({
+        'date': dates,
+        'title': [f"Article sur {k[0]} et {k[-1]}" for k in kws],
+        'kws': kws,
+        'loc': loc,
+        'org': org,
+        'per': per,
+        'content': [f"Ceci est un article fictif parlant de {', '.join(k)} à {', '.join(l)}." for k, l in zip(kws, loc)]
+    })
     
-    for d in dates:
-        topic = random.choice(topics)
-        
-        # Determine entities based on some probability to create patterns
-        kws = [topic] + random.sample(topics, k=random.randint(0, 2))
-        loc = random.sample(locations, k=random.randint(1, 3))
-        org = random.sample(orgs, k=random.randint(0, 2))
-        per = random.sample(persons, k=random.randint(0, 2))
-        
-        title = f"Article sur {topic} et {kws[-1]}"
-        content = f"Ceci est un article fictif parlant de {', '.join(kws)} à {', '.join(loc)}."
-        
-        # Store as stringified lists to match user schema
-        data.append({
-            'date': d,
-            'title': title,
-            'kws': str(kws),
-            'loc': str(loc),
-            'org': str(org),
-            'per': str(per),
-            'content': content
-        })
-        
-    df = pd.DataFrame(data)
-    output_path = 'data/processed/clean_data.csv'
-    df.to_csv(output_path, index=False)
+    # Same output as preprocessing.py (load_data prefers it over the CSV):
+    # list columns stay real lists, with no string parsing on load
+    output_path = 'data/processed/clean_data.parquet'
+    df.to_parquet(output_path, index=False, compression='zstd', engine='pyarrow')
     print(f"Saved dummy data to {output_path}")
 
 if __name__ == '__main__':
@@ -1,6 +1,7 @@
 from dash import dcc, html
 import dash_bootstrap_components as dbc
 from datetime import date
+from functools import lru_cache
 
 # Icons or specialized components could be added here
 
@@ -195,7 +196,11 @@ def create_tabs_content():
         active_tab="tab-overview"
     )
 
+@lru_cache(maxsize=1)
 def create_layout():
+    """
+    Builds the full component tree once; later calls reuse the same tree.
+    """
     return html.Div(
         [
             create_sidebar(),
@@ -205,6 +210,8 @@ def create_layout():
                     create_tabs_content(),
                     # Store for shared data signal (optional, but good practice for updates)
                     dcc.Store(id='store-data-trigger'),
+                    # Store for the current filter selection, read by KPI and chart callbacks
+                    dcc.Store(id='filter-selection'),
                     # Store for AI chat history
                     dcc.Store(id='ai-chat-history', data=[])
                 ],
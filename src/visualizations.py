@@ -1,29 +1,114 @@
-import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
-from .data_processing import explode_entities, compute_cooccurrence_matrix
+import numpy as np
+from .data_processing import entity_value_counts, compute_cooccurrence_matrix, head_entities, rank_codes
 
 TEMPLATE = "plotly_dark"
 COLOR_SCALE = "Teal"
 
+# Layout shared by every chart (dark template, transparent backgrounds, app font);
+# each figure adds its own title, axes and sizes on top
+BASE_LAYOUT = dict(
+    template=TEMPLATE,
+    plot_bgcolor='rgba(0,0,0,0)',
+    paper_bgcolor='rgba(0,0,0,0)',
+    font=dict(family="Inter, sans-serif", color='#e0e0e0')
+)
+
+# Longer timelines are downsampled (LTTB) to TIMELINE_POINTS points before plotting
+TIMELINE_MAX_POINTS = 2000
+TIMELINE_POINTS = 1500
+# Above this many points the timeline is drawn with WebGL, without the range slider
+TIMELINE_GL_POINTS = 500
+
+# Every chart but the timeline (already downsampled by LTTB) works on a fixed-seed sample
+# of at most MAX_ROWS articles: rankings hold on a sample, and its counts are scaled
+# back to estimated totals, flagged as such in the title
+MAX_ROWS = 200_000
+ESTIMATE_SUFFIX = " (estimation)"
+
+def _cap(df):
+    """
+    Returns (sample, scale): a fixed-seed random sample of at most MAX_ROWS rows of df
+    (kept in table order) and the factor turning its counts into estimated totals.
+    """
+    if len(df) <= MAX_ROWS:
+        return df, 1.0
+    positions = np.sort(np.random.default_rng(0).choice(len(df), MAX_ROWS, replace=False))
+    return df.iloc[positions], len(df) / MAX_ROWS
+
+def _estimated(counts, scale):
+    """
+    Counts measured on a sample, scaled to estimated totals (unchanged without sampling).
+    """
+    if scale == 1.0:
+        return counts
+    return np.rint(np.asarray(counts) * scale).astype(np.int64)
+
+def _title(title, scale):
+    """
+    Chart title, marked as an estimate when the chart was built on a sample.
+    """
+    return title + ESTIMATE_SUFFIX if scale != 1.0 else title
+
+def lttb_indices(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets downsampling: indices of the n_out points of (x, y)
+    that best keep the shape of the curve. The first and last points are always kept.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    # n_out - 2 buckets between the first and the last point
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    selected = np.empty(n_out, dtype=np.intp)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # Third vertex: the mean of the next bucket (the last point for the last bucket)
+        next_lo, next_hi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        cx, cy = x[next_lo:next_hi].mean(), y[next_lo:next_hi].mean()
+        areas = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(np.argmax(areas))
+        selected[i + 1] = a
+    return selected
+
 def create_timeline(df):
     """
-    Creates a time series chart of article volume with a RangeSlider.
+    Creates a time series chart of article volume.
+    Up to TIMELINE_GL_POINTS points it is an SVG line with a RangeSlider; above that
+    (long ranges, even once downsampled by LTTB) it is drawn with WebGL and no slider.
     """
     if df.empty:
         return go.Figure()
         
-    # Resample by day
-    daily_counts = df.groupby(df['date'].dt.date).size().reset_index(name='count')
-    
-    fig = px.area(daily_counts, x='date', y='count', 
-                  title="Évolution du Volume d'Articles",
-                  template=TEMPLATE)
+    # Count per day with one bincount over the precomputed day numbers (days without articles are skipped)
+    days = df['day_idx'].to_numpy()
+    first_day = days.min()
+    counts = np.bincount(days - first_day)
+    active_days = np.flatnonzero(counts)
+    if len(active_days) > TIMELINE_MAX_POINTS:
+        active_days = active_days[lttb_indices(active_days, counts[active_days], TIMELINE_POINTS)]
     
-    fig.update_traces(line_color='#00bc8c', fillcolor='rgba(0, 188, 140, 0.3)')
+    # A filled line trace built directly from the two arrays (WebGL for long series)
+    use_gl = len(active_days) > TIMELINE_GL_POINTS
+    trace = go.Scattergl if use_gl else go.Scatter
+    fig = go.Figure(trace(
+        x=(active_days + first_day).astype('datetime64[D]'),
+        y=counts[active_days],
+        mode='lines', fill='tozeroy',
+        line_color='#00bc8c', fillcolor='rgba(0, 188, 140, 0.3)',
+        hovertemplate="date=%{x}<br>count=%{y}<extra></extra>"
+    ))
     
     fig.update_layout(
+        **BASE_LAYOUT,
+        title="Évolution du Volume d'Articles",
         xaxis=dict(
+            title="date",
             rangeselector=dict(
                 buttons=list([
                     dict(count=7, label="1w", step="day", stepmode="backward"),
@@ -35,7 +120,8 @@ def create_timeline(df):
                 activecolor="#00bc8c",
                 font=dict(color="white")
             ),
-            rangeslider=dict(visible=True, bordercolor="#444", bgcolor="#111"),
+            # The slider redraws the whole series (and cannot show WebGL traces)
+            rangeslider=dict(visible=not use_gl, bordercolor="#444", bgcolor="#111"),
             type="date",
             gridcolor="rgba(255,255,255,0.1)"
         ),
@@ -44,10 +130,7 @@ def create_timeline(df):
             gridcolor="rgba(255,255,255,0.1)"
         ),
         title_font_size=16,
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
-        margin=dict(l=20, r=20, t=40, b=20),
-        font=dict(family="Inter, sans-serif", color='#e0e0e0')
+        margin=dict(l=20, r=20, t=40, b=20)
     )
     return fig
 
@@ -58,40 +141,65 @@ def create_sunburst(df):
     """
     if df.empty:
         return go.Figure()
+    df, scale = _cap(df)
 
     # Strategy: Explode both Loc and Org. 
     # This can be expensive. Let's simplify: Take top pairs.
-    # We create a list of (Loc, Org) tuples from each article.
+    # Every (Loc, Org) pair of each article, as integer codes (sorted codes: groupby order).
     
-    pairs = []
     # Limit to first few items to keep it readable and performant
-    for _, row in df.iterrows():
-        locs = row['loc'][:2] if len(row['loc']) > 0 else ['Unknown Loc']
-        orgs = row['org'][:2] if len(row['org']) > 0 else ['Unknown Org']
-        for l in locs:
-            for o in orgs:
-                pairs.append({'World': 'Monde', 'Location': l, 'Organization': o})
-                
-    flat_df = pd.DataFrame(pairs)
-    
-    # Filter to top occurrences to avoid clutter
-    if len(flat_df) > 1000:
-        top_locs = flat_df['Location'].value_counts().head(20).index
-        flat_df = flat_df[flat_df['Location'].isin(top_locs)]
-    
-    grouped = flat_df.groupby(['World', 'Location', 'Organization']).size().reset_index(name='count')
-    
-    fig = px.sunburst(grouped, path=['World', 'Location', 'Organization'], values='count',
-                      color='count', color_continuous_scale=COLOR_SCALE,
-                      title="Hiérarchie Lieux - Organisations",
-                      template=TEMPLATE)
+    loc_rows, locs = head_entities(df['loc'], 2, 'Unknown Loc')
+    org_rows, orgs = head_entities(df['org'], 2, 'Unknown Org')
+    loc_codes, loc_values = pd.factorize(locs, sort=True)
+    org_codes, org_values = pd.factorize(orgs, sort=True)
+    
+    # Each location is paired once per organization of its article (every article has both)
+    org_counts = np.bincount(org_rows, minlength=len(df))
+    org_starts = np.cumsum(org_counts) - org_counts
+    reps = org_counts[loc_rows]
+    
+    # Filter to top occurrences to avoid clutter: the top locations are ranked on their
+    # pair counts (ties in order of first appearance) before any pair is built
+    if reps.sum() > 1000:
+        keep = np.isin(loc_codes, rank_codes(loc_codes, 20, weights=reps)[0])
+        loc_rows, loc_codes, reps = loc_rows[keep], loc_codes[keep], reps[keep]
+    
+    within = np.arange(reps.sum()) - np.repeat(np.cumsum(reps) - reps, reps)
+    pair_locs = np.repeat(loc_codes, reps)
+    pair_orgs = org_codes[np.repeat(org_starts[loc_rows], reps) + within]
+    
+    # Pairs deduplicated and counted on one packed integer key each
+    keys, counts = np.unique(pair_locs.astype(np.int64) * len(org_values) + pair_orgs, return_counts=True)
+    loc_idx, org_idx = np.divmod(keys, len(org_values))
+    counts = _estimated(counts, scale)
+    used_locs, loc_idx = np.unique(loc_idx, return_inverse=True)
+    loc_values = loc_values[used_locs]
+    
+    # Monde -> Location -> Organization nodes (organizations, then locations, then the root).
+    # A parent's value is the sum of its children's, its colour their count-weighted mean
+    loc_totals = np.bincount(loc_idx, weights=counts, minlength=len(loc_values))
+    loc_colors = np.bincount(loc_idx, weights=counts * counts, minlength=len(loc_values)) / loc_totals
+    loc_ids = ['Monde/' + loc for loc in loc_values]
+    
+    fig = go.Figure(go.Sunburst(
+        ids=[f"{loc_ids[l]}/{org_values[o]}" for l, o in zip(loc_idx, org_idx)] + loc_ids + ['Monde'],
+        labels=org_values[org_idx].tolist() + loc_values.tolist() + ['Monde'],
+        parents=[loc_ids[l] for l in loc_idx] + ['Monde'] * len(loc_ids) + [''],
+        values=np.concatenate([counts, loc_totals.astype(np.int64), [counts.sum()]]),
+        branchvalues='total',
+        marker=dict(
+            colors=np.concatenate([counts, loc_colors, [(counts * counts).sum() / counts.sum()]]),
+            coloraxis='coloraxis'
+        ),
+        hovertemplate="labels=%{label}<br>count=%{value}<br>parent=%{parent}<extra></extra>"
+    ))
     
     fig.update_layout(
+        **BASE_LAYOUT,
+        title=_title("Hiérarchie Lieux - Organisations", scale),
+        coloraxis=dict(colorscale=COLOR_SCALE, colorbar_title_text='count'),
         margin=dict(l=0, r=0, t=40, b=0),
-        title_font_size=16,
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
-        font=dict(family="Inter, sans-serif", color='#e0e0e0')
+        title_font_size=16
     )
     return fig
 
@@ -101,24 +209,23 @@ def create_cooccurrence_heatmap(df):
     """
     if df.empty:
         return go.Figure()
+    df, scale = _cap(df)
         
     cooc_mat = compute_cooccurrence_matrix(df, entity_col='kws', top_n=25)
     
+    # int32 cells (half the bytes of int64 once encoded) and plain label lists
     fig = go.Figure(data=go.Heatmap(
-        z=cooc_mat.values,
-        x=cooc_mat.columns,
-        y=cooc_mat.index,
+        z=_estimated(cooc_mat.to_numpy(), scale).astype(np.int32),
+        x=cooc_mat.columns.tolist(),
+        y=cooc_mat.index.tolist(),
         colorscale='Viridis',
         hoverongaps=False
     ))
     
     fig.update_layout(
-        title="Matrice de Co-occurrence des Mots-clés",
-        template=TEMPLATE,
+        **BASE_LAYOUT,
+        title=_title("Matrice de Co-occurrence des Mots-clés", scale),
         height=600,
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
-        font=dict(family="Inter, sans-serif", color='#e0e0e0'),
         xaxis=dict(side="bottom", tickangle=-45)
     )
     return fig
@@ -129,24 +236,23 @@ def create_top_persons_bar(df):
     """
     if df.empty:
         return go.Figure()
+    df, scale = _cap(df)
 
-    all_persons = explode_entities(df, 'per')
-    top_persons = all_persons.value_counts().head(20).reset_index()
-    top_persons.columns = ['Person', 'Count']
-    top_persons = top_persons.sort_values(by='Count', ascending=True) # Ascending for horiz bar
+    top_persons = entity_value_counts(df, 'per', 20).iloc[::-1] # Ascending for horiz bar
+    counts = _estimated(top_persons.to_numpy(), scale)
     
-    fig = px.bar(top_persons, x='Count', y='Person', orientation='h',
-                 title="Top 20 Personnalités Citées",
-                 template=TEMPLATE,
-                 color='Count', color_continuous_scale=COLOR_SCALE)
+    # 20 rows: a single prebuilt trace from two arrays, no intermediate DataFrames
+    fig = go.Figure(go.Bar(
+        x=counts, y=top_persons.index.tolist(), orientation='h',
+        marker=dict(color=counts, colorscale=COLOR_SCALE),
+        hovertemplate="Count=%{x}<br>Person=%{y}<extra></extra>"
+    ))
     
     fig.update_layout(
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
+        **BASE_LAYOUT,
+        title=_title("Top 20 Personnalités Citées", scale),
         xaxis_title="Mentions",
-        yaxis_title="",
-        font=dict(family="Inter, sans-serif", color='#e0e0e0'),
-        coloraxis_showscale=False
+        yaxis_title=""
     )
     return fig
 
@@ -156,24 +262,22 @@ def create_top_locations_bar(df):
     """
     if df.empty:
         return go.Figure()
+    df, scale = _cap(df)
 
-    all_locs = explode_entities(df, 'loc')
-    top_locs = all_locs.value_counts().head(15).reset_index()
-    top_locs.columns = ['Location', 'Count']
-    top_locs = top_locs.sort_values(by='Count', ascending=True)
+    top_locs = entity_value_counts(df, 'loc', 15).iloc[::-1]
+    counts = _estimated(top_locs.to_numpy(), scale)
     
-    fig = px.bar(top_locs, x='Count', y='Location', orientation='h',
-                 title="Top 15 Lieux Mentionnés",
-                 template=TEMPLATE,
-                 color='Count', color_continuous_scale='Purples')
+    fig = go.Figure(go.Bar(
+        x=counts, y=top_locs.index.tolist(), orientation='h',
+        marker=dict(color=counts, colorscale='Purples'),
+        hovertemplate="Count=%{x}<br>Location=%{y}<extra></extra>"
+    ))
     
     fig.update_layout(
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
+        **BASE_LAYOUT,
+        title=_title("Top 15 Lieux Mentionnés", scale),
         xaxis_title="Mentions",
-        yaxis_title="",
-        font=dict(family="Inter, sans-serif", color='#e0e0e0'),
-        coloraxis_showscale=False
+        yaxis_title=""
     )
     return fig
 
@@ -184,46 +288,42 @@ def create_wordcloud_scatter(df):
     """
     if df.empty:
         return go.Figure()
+    df, scale = _cap(df)
     
-    all_kws = explode_entities(df, 'kws')
-    kw_counts = all_kws.value_counts().head(50)
+    kw_counts = entity_value_counts(df, 'kws', 50)
     
     if kw_counts.empty:
         return go.Figure()
     
+    words = kw_counts.index.to_numpy()
+    counts = _estimated(kw_counts.to_numpy(), scale)
+    
     # Normalize sizes
-    max_count = kw_counts.max()
     min_size, max_size = 12, 60
-    sizes = min_size + (kw_counts / max_count) * (max_size - min_size)
-    
-    # Create random positions
-    import random
-    random.seed(42)
-    x_pos = [random.uniform(0, 100) for _ in range(len(kw_counts))]
-    y_pos = [random.uniform(0, 100) for _ in range(len(kw_counts))]
-    
-    fig = go.Figure()
-    
-    for i, (word, count) in enumerate(kw_counts.items()):
-        fig.add_trace(go.Scatter(
-            x=[x_pos[i]],
-            y=[y_pos[i]],
-            mode='text',
-            text=[word],
-            textfont=dict(size=sizes.iloc[i], color='#00bc8c'),
-            hoverinfo='text',
-            hovertext=f"{word}: {count} mentions",
-            showlegend=False
-        ))
+    sizes = min_size + (counts / counts.max()) * (max_size - min_size)
+    
+    # Create random positions (seeded, so a selection always gets the same layout)
+    rng = np.random.default_rng(42)
+    x_pos = rng.uniform(0, 100, len(words))
+    y_pos = rng.uniform(0, 100, len(words))
+    
+    # A single text trace with per-word sizes, rather than one trace per word
+    fig = go.Figure(go.Scatter(
+        x=x_pos,
+        y=y_pos,
+        mode='text',
+        text=words,
+        textfont=dict(size=sizes, color='#00bc8c'),
+        hoverinfo='text',
+        hovertext=[f"{word}: {count} mentions" for word, count in zip(words, counts)],
+        showlegend=False
+    ))
     
     fig.update_layout(
-        title="Nuage de Mots-clés",
-        template=TEMPLATE,
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
+        **BASE_LAYOUT,
+        title=_title("Nuage de Mots-clés", scale),
         xaxis=dict(showgrid=False, showticklabels=False, zeroline=False),
         yaxis=dict(showgrid=False, showticklabels=False, zeroline=False),
-        font=dict(family="Inter, sans-serif", color='#e0e0e0'),
         height=400
     )
     return fig